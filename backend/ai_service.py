@@ -4,6 +4,7 @@ from dotenv import load_dotenv
 import threading
 from queue import Queue
 from typing import Optional
+from response_cache import ResponseCache, hash_api_key, make_cache_key
 
 load_dotenv()
 
@@ -17,6 +18,35 @@ class AIService:
         self.request_queue = Queue()
         self.active_requests = 0
         self.lock = threading.Lock()
+        
+        self.enable_cache = os.getenv('ENABLE_AI_CACHE', 'true').lower() == 'true'
+        self.cache_ttl = float(os.getenv('AI_CACHE_TTL', '3600'))
+        self.key_cache_ttl = float(os.getenv('AI_CACHE_KEY_TTL', '600'))
+        self.enable_cache_admin = os.getenv('ENABLE_AI_CACHE_ADMIN', 'false').lower() == 'true'
+        self.cache = None
+        if self.enable_cache:
+            self.cache = ResponseCache(
+                max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', '256')),
+                default_ttl=self.cache_ttl,
+                cache_dir=os.getenv('AI_CACHE_DIR') or None
+            )
+    
+    def _cache_key(self, api_key: Optional[str], kind: str, model: str, params: dict, text: str = '') -> str:
+        return make_cache_key(f'{hash_api_key(api_key)}:{kind}', model, params, text)
+    
+    def _cache_get(self, key: str):
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+    
+    def _cache_set(self, key: str, value, ttl: Optional[float] = None):
+        if self.cache is not None:
+            self.cache.set(key, value, ttl)
+    
+    def cache_stats(self) -> dict:
+        if self.cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
     
     def _get_client(self, api_key: Optional[str] = None):
         if api_key and api_key != 'your_api_key_here':
@@ -36,6 +66,11 @@ class AIService:
                     'error': 'API Key is empty or invalid'
                 }
             
+            cache_key = self._cache_key(api_key, 'test-key', 'glm-4-flash', {'max_tokens': 10}, 'test')
+            cached = self._cache_get(cache_key)
+            if cached:
+                return cached
+            
             response = client.chat.completions.create(
                 model='glm-4-flash',
                 messages=[
@@ -48,10 +83,12 @@ class AIService:
             )
             
             if response and response.choices:
-                return {
+                result = {
                     'valid': True,
                     'message': 'API Key is valid'
                 }
+                self._cache_set(cache_key, result, self.key_cache_ttl)
+                return result
             else:
                 return {
                     'valid': False,
@@ -82,6 +119,11 @@ class AIService:
         if not client:
             return None
         
+        cache_key = self._cache_key(api_key, 'summary', 'glm-4-flash', {'temperature': 0.7, 'max_tokens': 20000}, text[:4000])
+        cached = self._cache_get(cache_key)
+        if cached:
+            return cached
+        
         try:
             response = client.chat.completions.create(
                 model='glm-4-flash',
@@ -98,7 +140,9 @@ class AIService:
                 temperature=0.7,
                 max_tokens=20000
             )
-            return response.choices[0].message.content
+            summary = response.choices[0].message.content
+            self._cache_set(cache_key, summary)
+            return summary
         except Exception as e:
             print(f'生成摘要失败: {str(e)}')
             return None
@@ -140,6 +184,11 @@ class AIService:
         if not client:
             return None
         
+        cache_key = self._cache_key(api_key, 'chat', 'glm-4-flash', {'temperature': 0.7, 'max_tokens': 1000, 'question': question}, context[:3000])
+        cached = self._cache_get(cache_key)
+        if cached:
+            return cached
+        
         try:
             response = client.chat.completions.create(
                 model='glm-4-flash',
@@ -156,7 +205,9 @@ class AIService:
                 temperature=0.7,
                 max_tokens=1000
             )
-            return response.choices[0].message.content
+            answer = response.choices[0].message.content
+            self._cache_set(cache_key, answer)
+            return answer
         except Exception as e:
             print(f'AI 问答失败: {str(e)}')
             return None
@@ -169,6 +220,11 @@ class AIService:
         if not client:
             return None
         
+        cache_key = self._cache_key(api_key, 'chat-stream', 'glm-4-flash', {'temperature': 0.7, 'max_tokens': 100000, 'question': question}, context[:3000])
+        cached = self._cache_get(cache_key)
+        if cached:
+            return iter(cached)
+        
         try:
             response = client.chat.completions.create(
                 model='glm-4-flash',
@@ -186,9 +242,22 @@ class AIService:
                 max_tokens=100000,
                 stream=True
             )
-            return response
         except Exception as e:
             print(f'AI 问答流式输出失败: {str(e)}')
             return None
+        
+        return self._record_stream(response, cache_key)
+    
+    def _record_stream(self, response, cache_key: str):
+        pieces = []
+        for chunk in response:
+            if chunk.choices and len(chunk.choices) > 0:
+                delta = chunk.choices[0].delta
+                if hasattr(delta, 'content') and delta.content:
+                    pieces.append(delta.content)
+                    yield delta.content
+        
+        if pieces:
+            self._cache_set(cache_key, pieces)
 
 ai_service = AIService()
@@ -3,8 +3,10 @@ from flask_cors import CORS
 from pdf2docx import Converter
 import os
 import uuid
+import shutil
 from werkzeug.utils import secure_filename
 from ai_service import ai_service
+from document_store import DocumentStore
 import fitz
 from docx import Document
 
@@ -22,11 +24,92 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
+document_store = DocumentStore(
+    max_documents=int(os.getenv('DOCUMENT_SESSION_MAX', '32')),
+    max_bytes=int(os.getenv('DOCUMENT_SESSION_MAX_BYTES', str(64 * 1024 * 1024))),
+    ttl=float(os.getenv('DOCUMENT_SESSION_TTL', '1800'))
+)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def document_not_found():
+    return jsonify({'error': 'Document not found or expired'}), 404
+
+def resolve_text(data, field):
+    document_id = data.get('document_id')
+    if not document_id:
+        return data.get(field, ''), None
+    
+    session = document_store.get(document_id)
+    if session is None:
+        return None, document_not_found()
+    return session.text, None
+
+@app.route('/api/documents', methods=['POST'])
+def create_document():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Only PDF files are allowed'}), 400
+    
+    try:
+        filename = secure_filename(file.filename)
+        session = document_store.create(file, filename, app.config['UPLOAD_FOLDER'])
+        return jsonify({'success': True, **session.to_dict()})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/documents', methods=['GET'])
+def document_stats():
+    return jsonify(document_store.stats())
+
+@app.route('/api/documents/<document_id>', methods=['GET'])
+def get_document(document_id):
+    session = document_store.get(document_id)
+    if session is None:
+        return document_not_found()
+    return jsonify({'success': True, **session.to_dict()})
+
+@app.route('/api/documents/<document_id>', methods=['DELETE'])
+def delete_document(document_id):
+    if not document_store.delete(document_id):
+        return document_not_found()
+    return jsonify({'success': True})
+
 @app.route('/api/convert', methods=['POST'])
 def convert_pdf():
+    document_id = request.form.get('document_id')
+    if document_id:
+        session = document_store.acquire(document_id)
+        if session is None:
+            return document_not_found()
+        
+        try:
+            docx_path = session.convert(app.config['UPLOAD_FOLDER'])
+            if session.is_discarded():
+                return document_not_found()
+            
+            docx_filename = f'{uuid.uuid4()}_{session.original_name}.docx'
+            shutil.copyfile(docx_path, os.path.join(app.config['DOWNLOAD_FOLDER'], docx_filename))
+            
+            return jsonify({
+                'success': True,
+                'downloadUrl': f'/api/download/{docx_filename}',
+                'filename': f'{session.original_name}.docx'
+            })
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            session.release()
+    
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
@@ -68,6 +151,18 @@ def convert_pdf():
 
 @app.route('/api/extract-text', methods=['POST'])
 def extract_pdf_text():
+    document_id = request.form.get('document_id')
+    if document_id:
+        session = document_store.get(document_id)
+        if session is None:
+            return document_not_found()
+        
+        return jsonify({
+            'success': True,
+            'text': session.text,
+            'char_count': len(session.text)
+        })
+    
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
@@ -126,12 +221,28 @@ def ai_status():
         }
     })
 
+@app.route('/api/ai/cache', methods=['GET'])
+def ai_cache_stats():
+    return jsonify(ai_service.cache_stats())
+
+@app.route('/api/ai/cache', methods=['DELETE'])
+def ai_cache_clear():
+    if not ai_service.enable_cache_admin:
+        return jsonify({'error': 'Cache admin is disabled'}), 403
+    
+    if ai_service.cache is not None:
+        ai_service.cache.clear()
+    return jsonify({'success': True})
+
 @app.route('/api/ai/summary', methods=['POST'])
 def generate_summary():
     data = request.get_json()
-    text = data.get('text', '')
+    text, error = resolve_text(data, 'text')
     api_key = data.get('api_key')
     
+    if error:
+        return error
+    
     if not text:
         return jsonify({'error': 'No text provided'}), 400
     
@@ -152,10 +263,13 @@ def generate_summary():
 @app.route('/api/ai/translate', methods=['POST'])
 def translate_text():
     data = request.get_json()
-    text = data.get('text', '')
+    text, error = resolve_text(data, 'text')
     target_lang = data.get('target_lang', '中文')
     api_key = data.get('api_key')
     
+    if error:
+        return error
+    
     if not text:
         return jsonify({'error': 'No text provided'}), 400
     
@@ -177,9 +291,12 @@ def translate_text():
 def chat_with_document():
     data = request.get_json()
     question = data.get('question', '')
-    context = data.get('context', '')
+    context, error = resolve_text(data, 'context')
     api_key = data.get('api_key')
     
+    if error:
+        return error
+    
     if not question:
         return jsonify({'error': 'No question provided'}), 400
     
@@ -201,9 +318,12 @@ def chat_with_document():
 def chat_with_document_stream():
     data = request.get_json()
     question = data.get('question', '')
-    context = data.get('context', '')
+    context, error = resolve_text(data, 'context')
     api_key = data.get('api_key')
     
+    if error:
+        return error
+    
     if not question:
         return jsonify({'error': 'No question provided'}), 400
     
@@ -214,11 +334,8 @@ def chat_with_document_stream():
                 yield 'data: {"error": "Failed to get stream response"}\n\n'
                 return
             
-            for chunk in stream_response:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if hasattr(delta, 'content') and delta.content:
-                        yield f'data: {{"content": "{delta.content}"}}\n\n'
+            for content in stream_response:
+                yield f'data: {{"content": "{content}"}}\n\n'
             
             yield 'data: {"done": true}\n\n'
         except Exception as e:
@@ -249,36 +366,48 @@ def test_api_key():
 
 @app.route('/api/translate-pdf', methods=['POST'])
 def translate_pdf_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
-    
-    file = request.files['file']
     target_lang = request.form.get('target_lang', '中文')
     api_key = request.form.get('api_key')
+    document_id = request.form.get('document_id')
+    session = None
     
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
-        return jsonify({'error': 'Only PDF files are allowed'}), 400
-    
-    try:
-        filename = secure_filename(file.filename)
-        original_name = os.path.splitext(filename)[0]
-        unique_id = str(uuid.uuid4())
-        pdf_filename = f'{unique_id}_{filename}'
-        pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename)
-        
-        file.save(pdf_path)
+    if document_id:
+        session = document_store.acquire(document_id)
+        if session is None:
+            return document_not_found()
+    else:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
         
-        docx_filename = f'{unique_id}_{original_name}.docx'
-        docx_path = os.path.join(app.config['UPLOAD_FOLDER'], docx_filename)
+        file = request.files['file']
         
-        cv = Converter(pdf_path)
-        cv.convert(docx_path)
-        cv.close()
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
         
-        os.remove(pdf_path)
+        if not allowed_file(file.filename):
+            return jsonify({'error': 'Only PDF files are allowed'}), 400
+    
+    try:
+        unique_id = str(uuid.uuid4())
+        if session:
+            original_name = session.original_name
+            docx_path = session.convert(app.config['UPLOAD_FOLDER'])
+        else:
+            filename = secure_filename(file.filename)
+            original_name = os.path.splitext(filename)[0]
+            pdf_filename = f'{unique_id}_{filename}'
+            pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], pdf_filename)
+            
+            file.save(pdf_path)
+            
+            docx_filename = f'{unique_id}_{original_name}.docx'
+            docx_path = os.path.join(app.config['UPLOAD_FOLDER'], docx_filename)
+            
+            cv = Converter(pdf_path)
+            cv.convert(docx_path)
+            cv.close()
+            
+            os.remove(pdf_path)
         
         doc = Document(docx_path)
         
@@ -363,7 +492,8 @@ def translate_pdf_file():
         translated_path = os.path.join(app.config['DOWNLOAD_FOLDER'], translated_filename)
         doc.save(translated_path)
         
-        os.remove(docx_path)
+        if not session:
+            os.remove(docx_path)
         
         download_filename = f'{original_name}_translated.docx'
         return jsonify({
@@ -374,6 +504,9 @@ def translate_pdf_file():
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        if session:
+            session.release()
 
 @app.route('/api/translate-word', methods=['POST'])
 def translate_word_file():
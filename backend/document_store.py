@@ -0,0 +1,187 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import fitz
+from pdf2docx import Converter
+
+
+class DocumentSession:
+    def __init__(self, document_id: str, filename: str, pdf_path: str, text: str, page_count: int):
+        self.document_id = document_id
+        self.filename = filename
+        self.original_name = os.path.splitext(filename)[0]
+        self.pdf_path = pdf_path
+        self.text = text
+        self.size = len(text.encode('utf-8'))
+        self.page_count = page_count
+        self.docx_path = None
+        self.convert_lock = threading.Lock()
+        self.last_access = time.time()
+
+        self.state_lock = threading.Lock()
+        self.users = 0
+        self.discarded = False
+
+    def to_dict(self) -> dict:
+        return {
+            'document_id': self.document_id,
+            'filename': self.filename,
+            'page_count': self.page_count,
+            'char_count': len(self.text),
+            'converted': self.docx_path is not None
+        }
+
+    def convert(self, work_folder: str) -> str:
+        with self.convert_lock:
+            if self.docx_path and os.path.exists(self.docx_path):
+                return self.docx_path
+
+            docx_filename = f'{self.document_id}_{self.original_name}.docx'
+            docx_path = os.path.join(work_folder, docx_filename)
+
+            cv = Converter(self.pdf_path)
+            cv.convert(docx_path)
+            cv.close()
+
+            self.docx_path = docx_path
+            return docx_path
+
+    def is_discarded(self) -> bool:
+        with self.state_lock:
+            return self.discarded
+
+    def acquire(self):
+        with self.state_lock:
+            self.users += 1
+
+    def release(self):
+        with self.state_lock:
+            self.users -= 1
+            if not (self.discarded and self.users == 0):
+                return
+        self._remove_files()
+
+    def discard(self):
+        with self.state_lock:
+            self.discarded = True
+            if self.users > 0:
+                return
+        self._remove_files()
+
+    def _remove_files(self):
+        with self.convert_lock:
+            for path in (self.pdf_path, self.docx_path):
+                if not path:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class DocumentStore:
+    def __init__(self, max_documents: int = 32, max_bytes: int = 64 * 1024 * 1024, ttl: float = 1800):
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.sessions = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def create(self, file_storage, filename: str, upload_folder: str) -> DocumentSession:
+        document_id = str(uuid.uuid4())
+        pdf_path = os.path.join(upload_folder, f'{document_id}_{filename}')
+        file_storage.save(pdf_path)
+
+        try:
+            doc = fitz.open(pdf_path)
+            text_content = ''
+            for page in doc:
+                text_content += page.get_text()
+            page_count = doc.page_count
+            doc.close()
+        except Exception:
+            os.remove(pdf_path)
+            raise
+
+        session = DocumentSession(document_id, filename, pdf_path, text_content, page_count)
+
+        with self.lock:
+            removed = self._purge_expired()
+            self.sessions[document_id] = session
+            self.total_bytes += session.size
+            removed.extend(self._evict())
+        self._discard_all(removed)
+        return session
+
+    def get(self, document_id: Optional[str]) -> Optional[DocumentSession]:
+        return self._lookup(document_id, acquire=False)
+
+    def acquire(self, document_id: Optional[str]) -> Optional[DocumentSession]:
+        return self._lookup(document_id, acquire=True)
+
+    def _lookup(self, document_id: Optional[str], acquire: bool) -> Optional[DocumentSession]:
+        if not document_id:
+            return None
+        with self.lock:
+            removed = self._purge_expired()
+            session = self.sessions.get(document_id)
+            if session is not None:
+                session.last_access = time.time()
+                self.sessions.move_to_end(document_id)
+                if acquire:
+                    session.acquire()
+        self._discard_all(removed)
+        return session
+
+    def delete(self, document_id: str) -> bool:
+        with self.lock:
+            session = self.sessions.pop(document_id, None)
+            if session is not None:
+                self.total_bytes -= session.size
+        if session is None:
+            return False
+        session.discard()
+        return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            removed = self._purge_expired()
+            stats = {
+                'documents': len(self.sessions),
+                'max_documents': self.max_documents,
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            }
+        self._discard_all(removed)
+        return stats
+
+    def _purge_expired(self) -> list:
+        deadline = time.time() - self.ttl
+        expired = [doc_id for doc_id, session in self.sessions.items() if session.last_access < deadline]
+        removed = []
+        for doc_id in expired:
+            session = self.sessions.pop(doc_id)
+            self.total_bytes -= session.size
+            removed.append(session)
+        return removed
+
+    def _evict(self) -> list:
+        removed = []
+        while len(self.sessions) > 1 and (
+            len(self.sessions) > self.max_documents or self.total_bytes > self.max_bytes
+        ):
+            _, session = self.sessions.popitem(last=False)
+            self.total_bytes -= session.size
+            removed.append(session)
+        return removed
+
+    def _discard_all(self, sessions: list):
+        for session in sessions:
+            session.discard()
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def hash_api_key(api_key: Optional[str]) -> str:
+    if not api_key:
+        return 'anonymous'
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+def make_cache_key(namespace: str, model: str, params: dict, text: str = '') -> str:
+    payload = json.dumps(
+        {'namespace': namespace, 'model': model, 'params': params, 'text': text},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, default_ttl: float = 3600, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.cache_dir = cache_dir
+
+        self.entries = OrderedDict()
+        self.disk_keys = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _load_disk_index(self):
+        records = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp'):
+                self._remove_file(path)
+            elif name.endswith('.json'):
+                try:
+                    records.append((os.path.getmtime(path), name[:-len('.json')]))
+                except OSError:
+                    pass
+
+        for _, key in sorted(records):
+            self.disk_keys[key] = None
+        for key in self._trim_disk_index():
+            self._remove_disk(key)
+
+    def _trim_disk_index(self) -> list:
+        evicted = []
+        while len(self.disk_keys) > self.max_entries:
+            key, _ = self.disk_keys.popitem(last=False)
+            evicted.append(key)
+        return evicted
+
+    def _read_disk(self, key: str):
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if record.get('expires_at', 0) <= time.time():
+            return None
+        return record
+
+    def _write_disk(self, key: str, value: Any, expires_at: float):
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'value': value, 'expires_at': expires_at}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self._remove_file(tmp_path)
+            print(f'写入缓存失败: {str(e)}')
+
+    def _remove_disk(self, key: str):
+        self._remove_file(self._disk_path(key))
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            on_disk = key in self.disk_keys
+
+        if not on_disk:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        record = self._read_disk(key)
+        if record is None:
+            with self.lock:
+                self.disk_keys.pop(key, None)
+                self.misses += 1
+            self._remove_disk(key)
+            return None
+
+        with self.lock:
+            evicted = self._store(key, record['value'], record['expires_at'])
+            if key in self.disk_keys:
+                self.disk_keys.move_to_end(key)
+            self.hits += 1
+        for evicted_key in evicted:
+            self._remove_disk(evicted_key)
+        return record['value']
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if value is None:
+            return
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self.lock:
+            evicted = self._store(key, value, expires_at)
+            if self.cache_dir:
+                self.disk_keys[key] = None
+                self.disk_keys.move_to_end(key)
+                evicted.extend(self._trim_disk_index())
+
+        if self.cache_dir:
+            self._write_disk(key, value, expires_at)
+            with self.lock:
+                orphaned = key not in self.disk_keys
+            if orphaned:
+                self._remove_disk(key)
+            for evicted_key in evicted:
+                self._remove_disk(evicted_key)
+
+    def _store(self, key: str, value: Any, expires_at: float) -> list:
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            evicted_key, _ = self.entries.popitem(last=False)
+            self.disk_keys.pop(evicted_key, None)
+            evicted.append(evicted_key)
+        return evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.disk_keys.clear()
+            self.hits = 0
+            self.misses = 0
+
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json') or name.endswith('.tmp'):
+                    self._remove_file(os.path.join(self.cache_dir, name))
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'disk_entries': len(self.disk_keys),
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk': bool(self.cache_dir)
+            }